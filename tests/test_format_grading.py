@@ -11,8 +11,9 @@ This module tests the format grading capabilities including:
 - YAML format validation
 """
 
+import time
 import unittest
-from utils.graders import FormatGrader, FormatGradingCriteria, GradingResult
+from utils.graders import FormatGrader, FormatGradingCriteria, GradingResult, ValidationResult
 
 
 class TestFormatGrading(unittest.TestCase):
@@ -56,6 +57,16 @@ class TestFormatGrading(unittest.TestCase):
         self.assertLess(result.score, 10.0)
         self.assertIn("Missing required fields", result.feedback)
     
+    def test_json_format_validation_criteria_changed_in_place(self):
+        """Test field lists changed on the criteria in place are used by the next grade."""
+        self.format_grader.criteria = FormatGradingCriteria(required_format="json", required_fields=["name"])
+        self.assertTrue(self.format_grader.grade('{"name": "John"}').passed)
+        
+        self.format_grader.criteria.required_fields.append("age")
+        result = self.format_grader.grade('{"name": "John"}')
+        self.assertFalse(result.passed)
+        self.assertIn("Missing required fields: age", result.feedback)
+    
     def test_json_format_validation_forbidden_field(self):
         """Test JSON validation with forbidden fields."""
         criteria = FormatGradingCriteria(
@@ -72,6 +83,48 @@ class TestFormatGrading(unittest.TestCase):
         self.assertFalse(result.passed)
         self.assertIn("Contains forbidden fields", result.feedback)
     
+    def test_json_format_validation_rejects_infinite_numbers(self):
+        """Test numbers that overflow a double are invalid JSON."""
+        criteria = FormatGradingCriteria(required_format="json", required_fields=["a"])
+        self.format_grader.criteria = criteria
+        
+        for output in ['{"a": 1e400}', '{"a": -1e400}', '{"a": NaN}']:
+            with self.subTest(output=output):
+                result = self.format_grader.grade(output, "json")
+                self.assertFalse(result.passed)
+                self.assertIn("Invalid JSON format", result.feedback)
+        
+        self.assertTrue(self.format_grader.grade('{"a": 1e300}', "json").passed)
+    
+    def test_json_format_validation_schema(self):
+        """Test JSON validation against a nested JSON schema."""
+        criteria = FormatGradingCriteria(
+            required_format="json",
+            validate_json_schema=True,
+            json_schema={
+                "type": "object",
+                "required": ["name", "address"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "address": {
+                        "type": "object",
+                        "properties": {"zip": {"type": "string"}}
+                    }
+                }
+            }
+        )
+        self.format_grader.criteria = criteria
+        
+        result = self.format_grader.grade('{"name": "John", "address": {"zip": "12345"}}', "json")
+        self.assertTrue(result.passed)
+        
+        result = self.format_grader.grade('{"name": 7, "address": {"zip": 12345}}', "json")
+        self.assertFalse(result.passed)
+        self.assertEqual(
+            result.details["format_validation"]["errors"],
+            ["name: Expected string, got int", "address: zip: Expected string, got int"]
+        )
+    
     def test_xml_format_validation_valid(self):
         """Test valid XML format validation."""
         criteria = FormatGradingCriteria(
@@ -112,6 +165,49 @@ class TestFormatGrading(unittest.TestCase):
         self.assertFalse(result.passed)
         self.assertIn("Missing required sections", result.feedback)
     
+    def test_xml_format_validation_namespaced_sections(self):
+        """Test required sections match elements in a default namespace."""
+        criteria = FormatGradingCriteria(
+            required_format="xml",
+            required_sections=["item"]
+        )
+        self.format_grader.criteria = criteria
+        
+        namespaced_xml = '<root xmlns="http://example.com/ns"><item>1</item></root>'
+        result = self.format_grader.grade(namespaced_xml, "xml")
+        
+        self.assertTrue(result.passed)
+    
+    def test_xml_format_validation_mismatched_tags(self):
+        """Test XML validation rejects mismatched tags."""
+        criteria = FormatGradingCriteria(required_format="xml")
+        self.format_grader.criteria = criteria
+        
+        mismatched_xml = '<document><header>Title</body></document>'
+        result = self.format_grader.grade(mismatched_xml, "xml")
+        
+        self.assertIsInstance(result, GradingResult)
+        self.assertFalse(result.passed)
+        self.assertIn("malformed XML", result.feedback)
+    
+    def test_xml_format_validation_requires_well_formed_document(self):
+        """Test XML validation rejects output that is not a single well-formed document."""
+        criteria = FormatGradingCriteria(required_format="xml")
+        self.format_grader.criteria = criteria
+        
+        for malformed_xml in [
+            '<a>one</a><b>two</b>',
+            '<team>R&D</team>',
+            '<p>a&nbsp;b</p>',
+        ]:
+            with self.subTest(xml=malformed_xml):
+                result = self.format_grader.grade(malformed_xml, "xml")
+                self.assertFalse(result.passed)
+                self.assertIn("malformed XML", result.feedback)
+        
+        result = self.format_grader.grade('<team>R&amp;D<br/></team>', "xml")
+        self.assertTrue(result.passed)
+    
     def test_markdown_format_validation_valid(self):
         """Test valid Markdown format validation."""
         criteria = FormatGradingCriteria(
@@ -153,6 +249,66 @@ Content here.
         self.assertFalse(result.passed)
         self.assertIn("Missing required headers", result.feedback)
     
+    def test_markdown_format_validation_header_prefixes(self):
+        """Test required headers that are prefixes of each other."""
+        criteria = FormatGradingCriteria(
+            required_format="markdown",
+            required_headers=["Intro", "Introduction", "Usage"]
+        )
+        self.format_grader.criteria = criteria
+        
+        result = self.format_grader.grade("# Introduction\n## Usage notes\n", "markdown")
+        self.assertTrue(result.passed)
+        
+        result = self.format_grader.grade("# Intro\nUsage\n", "markdown")
+        self.assertFalse(result.passed)
+        self.assertIn("Missing required headers: Introduction, Usage", result.feedback)
+    
+    def test_markdown_format_validation_tables(self):
+        """Test Markdown table detection."""
+        criteria = FormatGradingCriteria(
+            required_format="markdown",
+            require_tables=True
+        )
+        self.format_grader.criteria = criteria
+
+        with_table = '''# Results
+
+| Name | Score |
+|------|:-----:|
+| John | 9     |
+'''
+        result = self.format_grader.grade(with_table, "markdown")
+        self.assertTrue(result.passed)
+
+        result = self.format_grader.grade(with_table.replace("\n", "\r\n"), "markdown")
+        self.assertTrue(result.passed)
+
+        without_table = '''# Results
+John scored 9 | Jane scored 8
+
+---
+'''
+        result = self.format_grader.grade(without_table, "markdown")
+        self.assertFalse(result.passed)
+        self.assertIn("Tables are required but not found", result.feedback)
+
+    def test_markdown_table_detection_long_pipe_line(self):
+        """Test table detection stays linear on a line of many pipes."""
+        criteria = FormatGradingCriteria(
+            required_format="markdown",
+            require_tables=True
+        )
+        self.format_grader.criteria = criteria
+
+        start = time.perf_counter()
+        result = self.format_grader.grade("# Pipes\n" + "|" * 200_000, "markdown")
+        elapsed = time.perf_counter() - start
+
+        self.assertFalse(result.passed)
+        self.assertIn("Tables are required but not found", result.feedback)
+        self.assertLess(elapsed, 1.0)
+
     def test_csv_format_validation_valid(self):
         """Test valid CSV format validation."""
         criteria = FormatGradingCriteria(
@@ -171,6 +327,36 @@ Jane,25
         self.assertTrue(result.passed)
         self.assertEqual(result.score, 10.0)
     
+    def test_csv_format_validation_crlf(self):
+        """Test CSV validation with Windows line endings."""
+        criteria = FormatGradingCriteria(
+            required_format="csv",
+            required_fields=["Name", "Age"]
+        )
+        self.format_grader.criteria = criteria
+        
+        result = self.format_grader.grade("Name,Age\r\nJohn,30\r\nJane,25\r\n", "csv")
+        self.assertTrue(result.passed)
+        
+        result = self.format_grader.grade("Name,Age\r\nJohn,30\r\nJane\r\n", "csv")
+        self.assertFalse(result.passed)
+        self.assertIn("Row 2 has 1 columns, expected 2", result.feedback)
+    
+    def test_csv_and_yaml_validation_accept_bytes(self):
+        """Test CSV and YAML validation of UTF-8 bytes matches str validation."""
+        criteria = FormatGradingCriteria(required_fields=["Name", "Age"])
+        self.format_grader.criteria = criteria
+        
+        for format_type, output in [
+            ("csv", "Name,Age\nJosé,30\nJane\n"),
+            ("yaml", "Name: José\nCity: Paris\n"),
+        ]:
+            with self.subTest(format_type=format_type):
+                expected = self.format_grader.grade(output, format_type)
+                result = self.format_grader.grade(output.encode("utf-8"), format_type)
+                self.assertFalse(expected.passed)
+                self.assertEqual(result, expected)
+    
     def test_csv_format_validation_missing_column(self):
         """Test CSV validation with missing required columns."""
         criteria = FormatGradingCriteria(
@@ -227,6 +413,26 @@ server:
         self.assertFalse(result.passed)
         self.assertIn("Missing required fields", result.feedback)
     
+    def test_validation_result_field_access(self):
+        """Test validation results support attribute and by-name access."""
+        result = self.format_grader.validate_xml_format("plain text")
+        
+        self.assertIsInstance(result, ValidationResult)
+        self.assertFalse(result.passed)
+        self.assertEqual(result["errors"], result.errors)
+        self.assertEqual(result.get("warnings"), [])
+        self.assertIsNone(result.get("missing"))
+        with self.assertRaises(KeyError):
+            result["missing"]
+        self.assertIn("passed", result)
+        self.assertNotIn("missing", result)
+        self.assertEqual(dict(result), {
+            "passed": False,
+            "feedback": result.feedback,
+            "errors": result.errors,
+            "warnings": [],
+        })
+    
     def test_automatic_format_detection(self):
         """Test automatic format detection from content."""
         # Test JSON detection
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the code-based and model-based graders.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from utils.graders import CodeGrader, Grader, GradingCriteria, ModelGrader
+
+
+class TestCodeGrader(unittest.TestCase):
+    """Test cases for CodeGrader."""
+
+    def test_verify_words_required_and_forbidden(self):
+        """Test required/forbidden word matching is case-insensitive."""
+        grader = CodeGrader(GradingCriteria(
+            required_words=["Return", "def"],
+            forbidden_words=["eval", "exec"]
+        ))
+
+        result = grader.verify_words("DEF add(a, b):\n    return a + b")
+        self.assertTrue(result["passed"])
+
+        result = grader.verify_words("def run(code):\n    exec(code)")
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["missing_required"], ["Return"])
+        self.assertEqual(result["found_forbidden"], ["exec"])
+
+    def test_verify_words_fast_fail_without_automaton(self):
+        """Test fast_fail reports only the first failing word when scanning per word."""
+        grader = CodeGrader(GradingCriteria(
+            required_words=["def", "yield"],
+            forbidden_words=["eval", "exec"]
+        ))
+
+        with patch.object(grader, "_word_automaton", None):
+            result = grader.verify_words("x = 1", fast_fail=True)
+            self.assertEqual(result["missing_required"], ["yield"])
+            self.assertEqual(result["found_forbidden"], [])
+
+            result = grader.verify_words("def f(): yield eval(exec)", fast_fail=True)
+            self.assertEqual(result["found_forbidden"], ["eval"])
+
+            result = grader.verify_words("x = 1")
+            self.assertEqual(result["missing_required"], ["def", "yield"])
+
+    def test_verify_words_after_criteria_change(self):
+        """Test reassigning criteria takes effect on the next check."""
+        grader = CodeGrader(GradingCriteria(required_words=["alpha"]))
+        self.assertTrue(grader.verify_words("alpha")["passed"])
+
+        grader.criteria = GradingCriteria(required_words=["beta"])
+        result = grader.verify_words("alpha")
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["missing_required"], ["beta"])
+
+    def test_criteria_word_lists_are_tuples(self):
+        """Test word lists passed as lists or None are stored as tuples."""
+        criteria = GradingCriteria(required_words=["def"], forbidden_words=None)
+
+        self.assertEqual(criteria.required_words, ("def",))
+        self.assertEqual(criteria.forbidden_words, ())
+        self.assertEqual(criteria, GradingCriteria(required_words=("def",)))
+
+    def test_criteria_fields_changed_in_place(self):
+        """Test word lists changed on the criteria in place are used by the next grade."""
+        grader = CodeGrader(GradingCriteria(forbidden_words=["eval"]))
+
+        grader.criteria.forbidden_words = ("exec",)
+        result = grader.grade("x = exec('1')", "python")
+        self.assertEqual(result.details["words"]["found_forbidden"], ["exec"])
+
+        grader.criteria.forbidden_words = None
+        grader.criteria = grader.criteria
+        result = grader.grade("x = exec('1')", "python")
+        self.assertTrue(result.details["words"]["passed"])
+
+    def test_readability_metrics(self):
+        """Test word and sentence counts used for readability scoring."""
+        grader = CodeGrader()
+
+        result = grader.calculate_readability_score("One two three. Four five!  Six?? ")
+        self.assertEqual(result["metrics"]["word_count"], 6)
+        self.assertEqual(result["metrics"]["sentence_count"], 3)
+
+    def test_grade_empty_output(self):
+        """Test grading an output with no readable content."""
+        result = CodeGrader().grade("   ")
+
+        self.assertFalse(result.passed)
+        self.assertFalse(result.details["readability"]["passed"])
+
+    def test_grade_scores_readability_on_raw_output(self):
+        """Test a trailing newline still counts toward the readability score."""
+        result = CodeGrader().grade("x = 1\n", "python")
+
+        self.assertEqual(result.score, 7)
+        self.assertTrue(result.passed)
+
+    def test_grade_fast_fail_stops_at_first_failure(self):
+        """Test fast_fail skips the checks after the first failure."""
+        grader = CodeGrader(GradingCriteria(min_length=100))
+
+        result = grader.grade("def f(:", language="python", fast_fail=True)
+        self.assertFalse(result.passed)
+        self.assertEqual(list(result.details), ["length"])
+
+        result = grader.grade("def f(:", language="python")
+        self.assertEqual(list(result.details), ["length", "words", "syntax", "readability"])
+
+
+class TestModelGrader(unittest.TestCase):
+    """Test cases for ModelGrader."""
+
+    def setUp(self):
+        """Set up a grader backed by a mock client."""
+        self.client = MagicMock()
+        self.client.messages.create.return_value.content = [MagicMock(text="8/10")]
+        self.model_grader = ModelGrader(client=self.client)
+
+    def test_client_created_on_first_use(self):
+        """Test a grader without a client only creates one when it is needed."""
+        with patch("utils.graders._create_client") as create_client, \
+                patch.dict("utils.graders._CLIENT_CACHE", clear=True):
+            model_grader = ModelGrader(api_key="test-key")
+            create_client.assert_not_called()
+
+            self.assertIs(model_grader.client, create_client.return_value)
+            self.assertIs(model_grader.client, create_client.return_value)
+            create_client.assert_called_once_with("test-key")
+
+    def test_client_shared_across_graders(self):
+        """Test graders without a client share one client per API key."""
+        with patch("utils.graders._create_client", side_effect=lambda key: MagicMock()), \
+                patch.dict("utils.graders._CLIENT_CACHE", clear=True):
+            first = ModelGrader(api_key="key-a")
+            second = Grader(api_key="key-a")
+            other = ModelGrader(api_key="key-b")
+
+            self.assertIs(second.client, first.client)
+            self.assertIsNot(other.client, first.client)
+
+    def test_assess_all_runs_each_assessment(self):
+        """Test assess_all makes a standalone call per criterion by default."""
+        results = self.model_grader.assess_all("Explain recursion", "A function calling itself.")
+
+        self.assertEqual(
+            list(results),
+            ["instruction_following", "completeness", "helpfulness", "safety"]
+        )
+        self.assertTrue(all(r["passed"] for r in results.values()))
+        self.assertEqual(results["safety"]["assessment"], "8/10")
+        self.assertEqual(self.client.messages.create.call_count, 4)
+
+    def test_assessments_reuse_quality_evaluation(self):
+        """Test opted-in quality criteria share one quality evaluation."""
+        self.client.messages.create.return_value.content = [MagicMock(text=(
+            '{"instruction_following": {"score": 9, "reasoning": "Follows"},'
+            ' "completeness": {"score": 6, "reasoning": "Partial"},'
+            ' "helpfulness": {"score": 8, "reasoning": "Useful"},'
+            ' "safety": {"score": 10, "reasoning": "Safe"},'
+            ' "overall_score": 8, "overall_feedback": "Good"}'
+        ))]
+        model_grader = ModelGrader(client=self.client, quality_criteria=[
+            "instruction_following", "completeness", "helpfulness", "safety"
+        ])
+
+        results = model_grader.assess_all("Explain recursion", "A function calling itself.")
+        completeness = model_grader.assess_completeness("Explain recursion", "A function calling itself.")
+
+        self.assertEqual(self.client.messages.create.call_count, 1)
+        self.assertEqual(results["completeness"], completeness)
+        self.assertEqual(completeness, {"passed": True, "assessment": "6/10\nPartial"})
+
+    def test_assessments_not_reused_without_opt_in(self):
+        """Test a prompt naming a criterion does not serve it from the quality evaluation."""
+        self.model_grader.set_grading_prompt('Score "completeness" for {prompt} and {response}.')
+
+        self.model_grader.assess_response_quality("Explain recursion", "A function calling itself.")
+        completeness = self.model_grader.assess_completeness("Explain recursion", "A function calling itself.")
+
+        self.assertEqual(self.client.messages.create.call_count, 2)
+        self.assertEqual(completeness, {"passed": True, "assessment": "8/10"})
+        with self.assertRaises(ValueError):
+            ModelGrader(client=self.client, quality_criteria=["tone"])
+
+    def test_assess_response_quality_reuses_cached_evaluation(self):
+        """Test identical prompt/response pairs only call the API once."""
+        self.client.messages.create.return_value.content = [
+            MagicMock(text='{"overall_score": 8, "overall_feedback": "Good"}')
+        ]
+
+        first = self.model_grader.assess_response_quality("Explain recursion", "A function calling itself.")
+        second = self.model_grader.assess_response_quality("Explain recursion", "A function calling itself.")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.client.messages.create.call_count, 1)
+
+        # A different grading prompt is a different evaluation
+        self.model_grader.set_strict_format_grading("json")
+        self.model_grader.assess_response_quality("Explain recursion", "A function calling itself.")
+        self.assertEqual(self.client.messages.create.call_count, 2)
+
+    def test_cached_evaluation_is_not_shared_with_callers(self):
+        """Test editing a returned result does not change later cached results."""
+        self.client.messages.create.return_value.content = [
+            MagicMock(text='{"overall_score": 8, "overall_feedback": "Good", "strengths": ["Clear"]}')
+        ]
+
+        first = self.model_grader.grade("Explain recursion", "A function calling itself.")
+        first.details["evaluation"]["strengths"].append("Edited")
+        second = self.model_grader.grade("Explain recursion", "A function calling itself.")
+
+        self.assertEqual(self.client.messages.create.call_count, 1)
+        self.assertEqual(second.details["evaluation"]["strengths"], ["Clear"])
+
+    def test_grade_derives_missing_overall_fields(self):
+        """Test grade falls back to per-criterion scores without overall fields."""
+        self.client.messages.create.return_value.content = [MagicMock(text=(
+            '{"completeness": {"score": 6, "reasoning": "Partial"},'
+            ' "safety": {"score": 10, "reasoning": "Safe"}}'
+        ))]
+
+        result = self.model_grader.grade("Explain recursion", "A function that calls itself.")
+
+        self.assertEqual(result.score, 8)
+        self.assertTrue(result.passed)
+        self.assertIn("completeness: 6/10 - Partial", result.feedback)
+
+
+
+class TestGrader(unittest.TestCase):
+    """Test cases for the combined Grader."""
+
+    def setUp(self):
+        """Set up a grader backed by a mock client."""
+        self.client = MagicMock()
+        self.client.messages.create.return_value.content = [
+            MagicMock(text='{"overall_score": 8, "overall_feedback": "Good"}')
+        ]
+        self.grader = Grader(client=self.client)
+
+    def test_grade_batch_concurrent_matches_serial(self):
+        """Test concurrent batch grading keeps input order and results."""
+        evaluations = [
+            {"prompt": "Write a function", "response": f"def f{i}():\n    return {i}"}
+            for i in range(6)
+        ]
+        evaluations.append({"prompt": "Create a JSON object", "response": '{"name": "John"}'})
+
+        serial = self.grader.grade_batch(evaluations)
+        concurrent = self.grader.grade_batch(evaluations, max_workers=4)
+
+        self.assertEqual([r["index"] for r in concurrent], list(range(len(evaluations))))
+        self.assertEqual(concurrent, serial)
+        self.assertIn("format_grader", concurrent[-1]["results"])
+
+    def test_grade_batch_grades_duplicates_once(self):
+        """Test repeated prompt/response pairs reuse the first item's grading."""
+        evaluations = [
+            {"prompt": "Write a function", "response": "def f():\n    return 1"},
+            {"prompt": "Write a function", "response": "def g():\n    return 2"},
+            {"prompt": "Write a function", "response": "def f():\n    return 1"},
+        ]
+
+        with patch.object(self.grader, "grade_comprehensive",
+                          wraps=self.grader.grade_comprehensive) as grade_comprehensive:
+            results = self.grader.grade_batch(evaluations)
+
+        self.assertEqual(grade_comprehensive.call_count, 2)
+        self.assertEqual([r["index"] for r in results], [0, 1, 2])
+        self.assertEqual(results[2]["results"], results[0]["results"])
+        self.assertIsNot(results[2]["results"], results[0]["results"])
+
+    def test_grade_batch_async_matches_grade_batch(self):
+        """Test async batch grading keeps input order and matches serial grading."""
+        async_client = MagicMock()
+        async_client.messages.create = AsyncMock(return_value=self.client.messages.create.return_value)
+        evaluations = [
+            {"prompt": "Write a function", "response": f"def f{i}():\n    return {i}"}
+            for i in range(5)
+        ]
+        evaluations.append({"prompt": "Create a JSON object", "response": '{"name": "John"}'})
+
+        results = asyncio.run(self.grader.grade_batch_async(evaluations, concurrency=2,
+                                                            async_client=async_client))
+
+        self.assertEqual(async_client.messages.create.await_count, len(evaluations))
+        self.client.messages.create.assert_not_called()
+        self.grader.model_grader.clear_evaluation_cache()
+        self.assertEqual(results, self.grader.grade_batch(evaluations))
+
+    def test_grade_batch_async_client_matches_model_grader_client(self):
+        """Test the async client is built from the model grader client's key and base URL."""
+        self.client.api_key = "test-key"
+        self.client.base_url = "https://proxy.example/"
+        async_client = MagicMock()
+        async_client.messages.create = AsyncMock(return_value=self.client.messages.create.return_value)
+        created = MagicMock()
+        created.__aenter__.return_value = async_client
+
+        with patch("utils.graders._create_async_client", return_value=created) as create:
+            asyncio.run(self.grader.grade_batch_async([{"prompt": "Explain", "response": "An answer."}]))
+
+        create.assert_called_once_with("test-key", "https://proxy.example/")
+        async_client.messages.create.assert_awaited_once()
+
+    def test_grade_batch_bulk_matches_grade_batch(self):
+        """Test Message Batches grading matches per-item grading and dedupes pairs."""
+        batches = self.client.messages.batches
+        submitted = []
+
+        def create(requests):
+            submitted.extend(requests)
+            return MagicMock(id="batch-1", processing_status="ended")
+
+        def results(batch_id):
+            for request in reversed(submitted):
+                entry = MagicMock(custom_id=request["custom_id"])
+                entry.result.type = "succeeded"
+                entry.result.message.content = [
+                    MagicMock(text='{"overall_score": 8, "overall_feedback": "Good"}')
+                ]
+                yield entry
+
+        batches.create.side_effect = create
+        batches.retrieve.return_value.processing_status = "ended"
+        batches.results.side_effect = results
+
+        evaluations = [
+            {"prompt": "Write a function", "response": "def f():\n    return 1"},
+            {"prompt": "Write a function", "response": "def f():\n    return 1"},
+            {"prompt": "Write a function", "response": "TODO"},
+            {"prompt": "Create a JSON object", "response": '{"name": "John"}'},
+        ]
+
+        with patch("utils.graders._MAX_BATCH_REQUESTS", 1):
+            bulk = self.grader.grade_batch_bulk(evaluations)
+
+        self.assertEqual(len(submitted), 2)
+        self.assertEqual(batches.create.call_count, 2)
+        self.client.messages.create.assert_not_called()
+        self.grader.model_grader.clear_evaluation_cache()
+        self.assertEqual(bulk, self.grader.grade_batch(evaluations))
+
+    def test_grade_batch_bulk_max_wait_fails_pending_items(self):
+        """Test batches that do not end within max_wait are cancelled and fail instead of blocking."""
+        batches = self.client.messages.batches
+        batches.create.return_value.id = "batch-1"
+        batches.retrieve.return_value.processing_status = "in_progress"
+
+        with patch("utils.graders.time.sleep") as sleep:
+            results = self.grader.grade_batch_bulk(
+                [{"prompt": "Write a function", "response": "def f():\n    return 1"}],
+                poll_interval=5.0, max_wait=0.0
+            )
+
+        sleep.assert_not_called()
+        batches.cancel.assert_called_once_with("batch-1")
+        model_result = results[0]["results"]["model_grader"]
+        self.assertFalse(model_result.passed)
+        self.assertIn("did not end within", model_result.feedback)
+
+    def test_grade_comprehensive_fast_fail_skips_model_grading(self):
+        """Test fast_fail skips the API call once code grading has failed."""
+        self.grader.set_code_criteria(GradingCriteria(min_length=100))
+
+        results = self.grader.grade_comprehensive("Write a function", "def f(): pass", fast_fail=True)
+
+        self.assertFalse(results["code_grader"].passed)
+        self.assertFalse(results["model_grader"].passed)
+        self.assertTrue(results["model_grader"].details["skipped"])
+        self.client.messages.create.assert_not_called()
+
+        results = self.grader.grade_comprehensive("Write a function", "def f(): pass")
+        self.assertEqual(results["model_grader"].score, 8)
+        self.client.messages.create.assert_called_once()
+
+    def test_grade_comprehensive_keeps_code_criteria(self):
+        """Test code checks on format tasks leave the code criteria in place."""
+        criteria = GradingCriteria(min_length=50)
+        self.grader.set_code_criteria(criteria)
+
+        results = self.grader.grade_comprehensive("Create a JSON object", '{"name": "John"}')
+
+        self.assertFalse(results["code_grader"].details["length"]["passed"])
+        self.assertIs(self.grader.code_grader.criteria, criteria)
+
+
+if __name__ == '__main__':
+    unittest.main()
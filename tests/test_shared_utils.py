@@ -14,6 +14,7 @@ from utils.shared_utils import (
     FormatDetector,
     ErrorHandler,
     TemplateRenderer,
+    _stdlib_json_loads,
 )
 from utils.graders import GradingResult
 
@@ -150,6 +151,21 @@ class TestIncompletenessDetector(unittest.TestCase):
                 self.assertNotEqual(error_msg, "Complete")
 
 
+class TestStdlibJsonLoads(unittest.TestCase):
+    """Test cases for the stdlib fallback used when orjson is not installed."""
+    
+    def test_rejects_non_finite_numbers(self):
+        """Test NaN, Infinity and overflowing floats are invalid, as with orjson."""
+        for text in ['{"a": NaN}', '{"a": Infinity}', '[-Infinity]', '{"a": 1e400}', b'[-1e400]']:
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    _stdlib_json_loads(text)
+    
+    def test_parses_finite_numbers(self):
+        """Test ordinary numbers parse as with json.loads."""
+        self.assertEqual(_stdlib_json_loads('{"a": 1.5, "b": 1e-400, "c": 7}'), {"a": 1.5, "b": 0.0, "c": 7})
+
+
 class TestResponseFormatter(unittest.TestCase):
     """Test cases for ResponseFormatter utility class."""
     
@@ -248,6 +264,19 @@ class TestFormatDetector(unittest.TestCase):
                 result = FormatDetector.detect_format_type(prompt, "")
                 self.assertEqual(result, expected)
     
+    def test_detect_format_type_prompt_priority(self):
+        """Test prompts mentioning several formats resolve in priority order."""
+        test_cases = [
+            ("Convert this XML into JSON", "json"),
+            ("Turn the YAML file into a CSV", "csv"),
+            ("Describe the GitHub XML schema", "xml"),
+        ]
+        
+        for prompt, expected in test_cases:
+            with self.subTest(prompt=prompt):
+                result = FormatDetector.detect_format_type(prompt, "")
+                self.assertEqual(result, expected)
+    
     def test_detect_format_type_from_response(self):
         """Test format detection from response content."""
         test_cases = [
@@ -3,12 +3,12 @@ from typing import Optional, List, Dict, Any, Tuple, Callable
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from utils.graders import Grader, GradingResult, GradingCriteria, FormatGradingCriteria
+from utils.graders import Grader, GradingResult, GradingCriteria, FormatGradingCriteria, ValidationResult
 from utils.shared_utils import IncompletenessDetector, ResponseFormatter, FormatDetector, ErrorHandler, TemplateRenderer
 
 
 class GradingResultEncoder(json.JSONEncoder):
-    """Custom JSON encoder for GradingResult objects"""
+    """Custom JSON encoder for GradingResult and ValidationResult objects"""
     
     def default(self, obj):
         if isinstance(obj, GradingResult):
@@ -18,6 +18,8 @@ class GradingResultEncoder(json.JSONEncoder):
                 "details": obj.details,
                 "passed": obj.passed
             }
+        if isinstance(obj, ValidationResult):
+            return dict(obj)
         return super().default(obj)
 
 
@@ -3,9 +3,58 @@ Shared utilities for evaluation and grading systems.
 Contains common functionality to avoid code duplication.
 """
 
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Union
 import re
 import json
+import math
+
+
+class _NonFiniteNumber(ValueError):
+    """Raised by the stdlib JSON hooks for a number JSON cannot represent."""
+
+
+def _reject_constant(token: str):
+    """parse_constant hook: NaN, Infinity and -Infinity are not JSON."""
+    raise _NonFiniteNumber(token)
+
+
+def _parse_finite_float(token: str) -> float:
+    """parse_float hook: reject floats that overflow a double."""
+    value = float(token)
+    if math.isinf(value):
+        raise _NonFiniteNumber(token)
+    return value
+
+
+def _stdlib_json_loads(text: Union[str, bytes]) -> Any:
+    """
+    Parse JSON with the stdlib, rejecting what orjson rejects.
+    
+    json.loads accepts NaN and Infinity and turns floats such as 1e400 into
+    inf; these raise json.JSONDecodeError here, so validity does not depend
+    on whether orjson is installed.
+    
+    Args:
+        text (Union[str, bytes]): The JSON text
+        
+    Returns:
+        Any: The parsed value
+    """
+    try:
+        return json.loads(text, parse_float=_parse_finite_float, parse_constant=_reject_constant)
+    except _NonFiniteNumber as e:
+        token = e.args[0]
+        doc = text if isinstance(text, str) else bytes(text).decode("utf-8", "replace")
+        raise json.JSONDecodeError(f"non-finite number is not valid JSON: {token}",
+                                   doc, max(doc.find(token), 0)) from None
+
+
+# orjson is an optional, faster drop-in for json.loads; fall back to the stdlib parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = _stdlib_json_loads
 
 
 class TemplateRenderer:
@@ -116,7 +165,8 @@ class IncompletenessDetector:
                 
         elif format_type == "json":
             try:
-                parsed = json.loads(response)
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                parsed = _json_loads(response)
                 if isinstance(parsed, dict):
                     if all(v in ["", None, [], {}] for v in parsed.values()):
                         return False, "JSON has only empty values"
@@ -168,7 +218,8 @@ class ResponseFormatter:
             # Try to extract valid JSON
             response = response.strip()
             try:
-                json.loads(response)
+                # Parsed only to check validity; the result is discarded
+                _json_loads(response)
                 return response
             except:
                 # Try to find JSON in response
@@ -176,7 +227,7 @@ class ResponseFormatter:
                 if json_match:
                     try:
                         # Validate the extracted JSON
-                        json.loads(json_match.group(0))
+                        _json_loads(json_match.group(0))
                         return json_match.group(0)
                     except:
                         pass
@@ -218,6 +269,16 @@ class ResponseFormatter:
 class FormatDetector:
     """Utility class for detecting and working with different formats."""
     
+    # Prompt keywords for each format; earlier groups take priority
+    PROMPT_FORMAT_PATTERN = re.compile(
+        r"(?P<json>json|javascript object notation)"
+        r"|(?P<xml>xml|extensible markup language)"
+        r"|(?P<markdown>markdown|md|github)"
+        r"|(?P<csv>csv|comma separated|spreadsheet)"
+        r"|(?P<yaml>yaml|yml)",
+        re.IGNORECASE
+    )
+    
     @staticmethod
     def detect_format_type(prompt: str, response: str) -> str:
         """
@@ -230,31 +291,29 @@ class FormatDetector:
         Returns:
             str: Detected format type
         """
-        prompt_lower = prompt.lower()
-        response_lower = response.lower()
-        
-        # Check prompt for format indicators
-        if any(word in prompt_lower for word in ["json", "javascript object notation"]):
-            return "json"
-        elif any(word in prompt_lower for word in ["xml", "extensible markup language"]):
-            return "xml"
-        elif any(word in prompt_lower for word in ["markdown", "md", "github"]):
-            return "markdown"
-        elif any(word in prompt_lower for word in ["csv", "comma separated", "spreadsheet"]):
-            return "csv"
-        elif any(word in prompt_lower for word in ["yaml", "yml", "yaml file"]):
-            return "yaml"
+        # Check prompt for format indicators in a single scan
+        best = None
+        for match in FormatDetector.PROMPT_FORMAT_PATTERN.finditer(prompt):
+            if best is None or match.lastindex < best.lastindex:
+                best = match
+                if best.lastindex == 1:
+                    break
+        if best is not None:
+            return best.lastgroup
         
         # Check response content for format indicators
-        if response.strip().startswith('{') and response.strip().endswith('}'):
+        stripped = response.strip()
+        if stripped.startswith('{') and stripped.endswith('}'):
             return "json"
-        elif response.strip().startswith('<') and '>' in response:
+        elif stripped.startswith('<') and '>' in response:
             return "xml"
-        elif '#' in response and ('```' in response or '**' in response or '*' in response):
+        # '**' and a count of at least one add nothing to the '*' and ',' / ':'
+        # presence tests, so each indicator is scanned for at most once
+        elif '#' in response and ('*' in response or '```' in response):
             return "markdown"
-        elif ',' in response and '\n' in response and response.count(',') >= 1 and not 'def ' in response:
+        elif ',' in response and '\n' in response and 'def ' not in response:
             return "csv"
-        elif ':' in response and ('-' in response or response.count(':') >= 1) and not 'def ' in response and not 'return ' in response:
+        elif ':' in response and 'def ' not in response and 'return ' not in response:
             return "yaml"
         
         # Default to text if no format detected